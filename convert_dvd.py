@@ -3,56 +3,97 @@
 DVD VOB to MP4 Converter
 
 Converts DVD VIDEO_TS structure (.VOB files) to modern MP4 format
-using H.264 video codec and AAC audio for maximum compatibility.
+using H.264 video. Dolby Digital (AC3/E-AC3) audio is copied as-is,
+any other audio is converted to AAC.
 """
 
+import argparse
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
-
-def get_vob_files(input_dir: Path) -> list[Path]:
+from dvd_ffmpeg import (
+    build_command,
+    concat_list,
+    get_vob_files,
+    group_titles,
+    plan_title,
+    worker_layout,
+)
+
+
+def convert_title_to_mp4(
+    title: str,
+    vob_paths: list[Path],
+    output_dir: Path,
+    threads: int,
+    segment_time: int | None = None,
+    stats: bool = True
+) -> bool:
     """
-    Get VOB files that contain actual video content.
-    Filters out small menu/navigation VOBs (< 1MB).
+    Convert all VOB files of a DVD title into a single MP4 using FFmpeg.
+    With segment_time, the output is split into numbered MP4 chunks instead.
+    Without stats, FFmpeg's progress line is hidden (parallel conversions).
     """
-    vob_files = sorted(input_dir.glob("*.VOB"))
-    return [f for f in vob_files if f.stat().st_size > 1_000_000]
-
-
-def convert_vob_to_mp4(vob_path: Path, output_dir: Path) -> bool:
-    """Convert a single VOB file to MP4 using FFmpeg."""
-    output_name = vob_path.stem + ".mp4"
-    output_path = output_dir / output_name
+    if segment_time:
+        output_path = output_dir / (title + "_%03d.mp4")
+        output_name = title + "_*.mp4"
+    else:
+        output_path = output_dir / (title + ".mp4")
+        output_name = output_path.name
 
     print(f"\n{'='*60}")
-    print(f"Converting: {vob_path.name}")
-    print(f"Output:     {output_path.name}")
+    print(f"Converting: {', '.join(vob.name for vob in vob_paths)}")
+    print(f"Output:     {output_name}")
     print(f"{'='*60}")
 
-    cmd = [
-        "ffmpeg",
-        "-i", str(vob_path),
-        "-c:v", "libx264",      # H.264 video codec (universal compatibility)
-        "-preset", "medium",    # Balance between speed and compression
-        "-crf", "20",           # Quality (18-23 is visually lossless range)
-        "-c:a", "aac",          # AAC audio codec
-        "-b:a", "192k",         # Audio bitrate
-        "-movflags", "+faststart",  # Enable streaming playback
-        "-y",                   # Overwrite output without asking
-        str(output_path)
-    ]
-
+    encoders, audio_codec = plan_title("ffmpeg", "ffprobe", vob_paths)
+
+    with concat_list(vob_paths) as list_path:
+        for encoder in encoders:
+            cmd = build_command(
+                "ffmpeg",
+                list_path,
+                output_path,
+                encoder,
+                threads=threads,
+                audio_codec=audio_codec,
+                segment_time=segment_time,
+                stats=stats
+            )
+            try:
+                subprocess.run(cmd, check=True, capture_output=False)
+                print(f"Done: {output_name}")
+                return True
+            except subprocess.CalledProcessError as e:
+                print(f"Error converting {title} with {encoder}: {e}", file=sys.stderr)
+
+    return False
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for options that must be a whole number above zero."""
     try:
-        result = subprocess.run(cmd, check=True, capture_output=False)
-        print(f"Done: {output_path.name}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error converting {vob_path.name}: {e}", file=sys.stderr)
-        return False
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value!r}")
+    return number
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Convert DVD VOB files to MP4.")
+    parser.add_argument(
+        "--segment-time",
+        type=_positive_int,
+        metavar="SECONDS",
+        help="split each title into MP4 files of about this length"
+    )
+    args = parser.parse_args()
+
     input_dir = Path(__file__).parent / "videos"
     output_dir = Path(__file__).parent / "converted"
 
@@ -68,18 +109,29 @@ def main():
         print("No VOB files found to convert.", file=sys.stderr)
         sys.exit(1)
 
-    print(f"Found {len(vob_files)} video file(s) to convert:")
-    for vob in vob_files:
-        size_mb = vob.stat().st_size / (1024 * 1024)
+    titles = group_titles([vob for vob, _ in vob_files])
+
+    print(f"Found {len(vob_files)} video file(s) in {len(titles)} title(s) to convert:")
+    for vob, size in vob_files:
+        size_mb = size / (1024 * 1024)
         print(f"  - {vob.name} ({size_mb:.1f} MB)")
 
-    success_count = 0
-    for vob in vob_files:
-        if convert_vob_to_mp4(vob, output_dir):
-            success_count += 1
+    workers, threads = worker_layout(len(titles))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            convert_title_to_mp4,
+            titles.keys(),
+            titles.values(),
+            repeat(output_dir),
+            repeat(threads),
+            repeat(args.segment_time),
+            repeat(workers == 1)    # Interleaved progress lines are unreadable
+        )
+        success_count = sum(results)
 
     print(f"\n{'='*60}")
-    print(f"Conversion complete: {success_count}/{len(vob_files)} files converted")
+    print(f"Conversion complete: {success_count}/{len(titles)} titles converted")
     print(f"Output directory: {output_dir}")
     print(f"{'='*60}")
 
@@ -4,13 +4,30 @@ DVD to MP4 Converter - Simple GUI for Windows
 A user-friendly application to convert DVD VIDEO_TS folders to MP4 files.
 """
 
+import functools
+import os
+import queue
+import shutil
 import subprocess
 import sys
 import threading
 import tkinter as tk
+from collections.abc import Callable
 from tkinter import filedialog, messagebox, ttk
 from pathlib import Path
 
+from dvd_ffmpeg import (
+    CREATION_FLAGS,
+    X264_PRESETS,
+    build_command,
+    concat_list,
+    get_vob_files,
+    group_titles,
+    plan_title,
+    probe_duration,
+    worker_layout,
+)
+
 
 def get_ffmpeg_path() -> str:
     """Get path to ffmpeg executable, handling PyInstaller bundling."""
@@ -24,23 +41,43 @@ def get_ffmpeg_path() -> str:
     return "ffmpeg"
 
 
+def get_ffprobe_path() -> str:
+    """Get path to ffprobe executable, handling PyInstaller bundling."""
+    if getattr(sys, "frozen", False):
+        bundle_dir = Path(sys._MEIPASS)
+        ffprobe_path = bundle_dir / "ffprobe.exe"
+        if ffprobe_path.exists():
+            return str(ffprobe_path)
+    return "ffprobe"
+
+
 class DVDConverterApp:
     def __init__(self, root: tk.Tk):
         self.root = root
         self.root.title("DVD to MP4 Converter")
-        self.root.geometry("500x350")
+        self.root.geometry("500x380")
         self.root.resizable(False, False)
 
         # Center window on screen
         self.root.update_idletasks()
         x = (self.root.winfo_screenwidth() - 500) // 2
-        y = (self.root.winfo_screenheight() - 350) // 2
-        self.root.geometry(f"500x350+{x}+{y}")
+        y = (self.root.winfo_screenheight() - 380) // 2
+        self.root.geometry(f"500x380+{x}+{y}")
 
         self.selected_folder: Path | None = None
         self.is_converting = False
 
+        # Resolve bundled tools once rather than per conversion
+        self._ffmpeg = get_ffmpeg_path()
+        self._ffprobe = get_ffprobe_path()
+
+        # Latest status/progress posted by worker threads, applied by _flush_status
+        self._pending_lock = threading.Lock()
+        self._pending_status: str | None = None
+        self._pending_progress: float | None = None
+
         self._create_widgets()
+        self.root.after(100, self._flush_status)
 
     def _create_widgets(self):
         # Main frame with padding
@@ -84,10 +121,40 @@ class DVDConverterApp:
         )
         self.browse_button.pack(side=tk.RIGHT, padx=(10, 0))
 
+        # Encoding options frame
+        options_frame = ttk.Frame(main_frame)
+        options_frame.pack(fill=tk.X, pady=(0, 15))
+
+        self.use_gpu = tk.BooleanVar(value=True)
+        self.gpu_checkbox = ttk.Checkbutton(
+            options_frame,
+            text="Use GPU acceleration (if available)",
+            variable=self.use_gpu
+        )
+        self.gpu_checkbox.pack(side=tk.LEFT)
+
+        self.preset_var = tk.StringVar(value="faster")
+        self.preset_combo = ttk.Combobox(
+            options_frame,
+            textvariable=self.preset_var,
+            values=X264_PRESETS,
+            state="readonly",
+            width=10
+        )
+        self.preset_combo.pack(side=tk.RIGHT)
+
+        preset_label = ttk.Label(
+            options_frame,
+            text="CPU speed:",
+            font=("Segoe UI", 9)
+        )
+        preset_label.pack(side=tk.RIGHT, padx=(0, 5))
+
         # Progress bar
         self.progress = ttk.Progressbar(
             main_frame,
-            mode="indeterminate",
+            mode="determinate",
+            maximum=100,
             length=460
         )
         self.progress.pack(pady=(0, 10))
@@ -138,7 +205,7 @@ class DVDConverterApp:
             return
 
         # Check for VOB files
-        vob_files = self._get_vob_files(self.selected_folder)
+        vob_files = [vob for vob, _ in get_vob_files(self.selected_folder)]
         if not vob_files:
             messagebox.showerror(
                 "No Videos Found",
@@ -159,80 +226,179 @@ class DVDConverterApp:
         self.is_converting = True
         self.convert_button.config(state=tk.DISABLED)
         self.browse_button.config(state=tk.DISABLED)
-        self.progress.start(10)
+        self.gpu_checkbox.config(state=tk.DISABLED)
+        self.preset_combo.config(state=tk.DISABLED)
+        titles = group_titles(vob_files)
+        self.progress.config(value=0)
         self.open_folder_button.pack_forget()
 
         # Run conversion in background thread
-        thread = threading.Thread(target=self._convert, args=(vob_files,))
+        thread = threading.Thread(
+            target=self._convert,
+            args=(titles, self.use_gpu.get(), self.preset_var.get())
+        )
         thread.daemon = True
         thread.start()
 
-    def _get_vob_files(self, folder: Path) -> list[Path]:
-        """Get VOB files larger than 1MB (actual video content)."""
-        vob_files = sorted(folder.glob("*.VOB"))
-        return [f for f in vob_files if f.stat().st_size > 1_000_000]
-
     def _check_ffmpeg(self) -> bool:
         """Check if FFmpeg is available."""
-        try:
-            subprocess.run(
-                [get_ffmpeg_path(), "-version"],
-                capture_output=True,
-                check=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
-            )
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        return shutil.which(self._ffmpeg) is not None or Path(self._ffmpeg).is_file()
 
-    def _convert(self, vob_files: list[Path]):
+    def _convert(self, titles: dict[str, list[Path]], use_gpu: bool, preset: str):
         """Run conversion in background thread."""
         output_dir = self.selected_folder.parent / "Converted_MP4"
         output_dir.mkdir(exist_ok=True)
         self.output_folder = output_dir
 
+        # Overall progress is weighted by duration (0 when ffprobe can't tell)
+        durations: dict[str, float] = {}
+        for title, vobs in titles.items():
+            vob_durations = [probe_duration(self._ffprobe, vob) for vob in vobs]
+            durations[title] = sum(vob_durations) if all(vob_durations) else 0.0
+
+        # Titles of unknown length count as an average title and only advance
+        # the bar once they finish
+        known = [duration for duration in durations.values() if duration]
+        fallback = sum(known) / len(known) if known else 1.0
+        weights = {title: duration or fallback for title, duration in durations.items()}
+        total_weight = sum(weights.values())
+        encoded = dict.fromkeys(titles, 0.0)
+
+        jobs: queue.Queue[tuple[str, list[Path]]] = queue.Queue()
+        for title, vobs in titles.items():
+            jobs.put((title, vobs))
+
+        total = len(titles)
+        worker_count, threads = worker_layout(total)
+
+        lock = threading.Lock()
+        finished = 0
         success_count = 0
-        total = len(vob_files)
-
-        for i, vob in enumerate(vob_files, 1):
-            self._update_status(f"Converting {i}/{total}: {vob.name}...")
-
-            output_path = output_dir / (vob.stem + ".mp4")
-
-            cmd = [
-                get_ffmpeg_path(),
-                "-i", str(vob),
-                "-c:v", "libx264",
-                "-preset", "medium",
-                "-crf", "20",
-                "-c:a", "aac",
-                "-b:a", "192k",
-                "-movflags", "+faststart",
-                "-y",
-                str(output_path)
-            ]
-
-            try:
-                # Hide console window on Windows
-                creation_flags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
-                subprocess.run(cmd, check=True, capture_output=True, creationflags=creation_flags)
-                success_count += 1
-            except subprocess.CalledProcessError:
-                pass
+
+        def report(title: str, seconds: float):
+            with lock:
+                encoded[title] = min(seconds, weights[title])
+                percent = sum(encoded.values()) / total_weight * 100
+            self._update_progress(percent)
+
+        def worker():
+            nonlocal finished, success_count
+            while True:
+                try:
+                    title, vobs = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                self._update_status(f"Converting {title} ({len(vobs)} file(s))...")
+                ok = self._convert_title(
+                    vobs,
+                    output_dir / (title + ".mp4"),
+                    preset,
+                    threads,
+                    use_gpu,
+                    functools.partial(report, title) if durations[title] else lambda _: None
+                )
+                # A failed title drops back out of the bar instead of counting as done
+                report(title, weights[title] if ok else 0.0)
+                with lock:
+                    finished += 1
+                    success_count += ok
+                    done = finished
+                self._update_status(f"Converted {done}/{total} video(s)...")
+
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(worker_count)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
 
         # Update UI on main thread
         self.root.after(0, lambda: self._conversion_complete(success_count, total))
 
+    def _convert_title(
+        self,
+        vobs: list[Path],
+        output_path: Path,
+        preset: str,
+        threads: int,
+        use_gpu: bool,
+        on_progress: Callable[[float], None]
+    ) -> bool:
+        """Convert the VOB files of one title into a single MP4."""
+        encoders, audio_codec = plan_title(self._ffmpeg, self._ffprobe, vobs, use_gpu)
+
+        with concat_list(vobs) as list_path:
+            for encoder in encoders:
+                cmd = build_command(
+                    self._ffmpeg,
+                    list_path,
+                    output_path,
+                    encoder,
+                    preset=preset,
+                    threads=threads,
+                    audio_codec=audio_codec,
+                    loglevel="error",
+                    progress=True,
+                    use_gpu=use_gpu
+                )
+                on_progress(0.0)
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    bufsize=0,
+                    creationflags=CREATION_FLAGS
+                )
+                # Read the pipe in large raw chunks and report once per chunk;
+                # -progress emits key=value lines, out_time_ms is in microseconds
+                fd = process.stdout.fileno()
+                pending = b""
+                while chunk := os.read(fd, 65536):
+                    *lines, pending = (pending + chunk).split(b"\n")
+                    seconds = None
+                    for line in lines:
+                        key, _, value = line.strip().partition(b"=")
+                        if key == b"out_time_ms" and value.isdigit():
+                            seconds = int(value) / 1_000_000
+                    if seconds is not None:
+                        on_progress(seconds)
+                process.stdout.close()
+                if process.wait() == 0:
+                    return True
+        return False
+
     def _update_status(self, text: str):
         """Update status label from any thread."""
-        self.root.after(0, lambda: self.status_label.config(text=text))
+        with self._pending_lock:
+            self._pending_status = text
+
+    def _update_progress(self, value: float):
+        """Update progress bar from any thread."""
+        with self._pending_lock:
+            self._pending_progress = value
+
+    def _apply_pending(self):
+        """Apply the latest status and progress posted by worker threads."""
+        with self._pending_lock:
+            status, self._pending_status = self._pending_status, None
+            progress, self._pending_progress = self._pending_progress, None
+        if status is not None:
+            self.status_label.config(text=status)
+        if progress is not None:
+            self.progress.config(value=progress)
+
+    def _flush_status(self):
+        """Refresh status and progress at most 10 times per second."""
+        self._apply_pending()
+        self.root.after(100, self._flush_status)
 
     def _conversion_complete(self, success: int, total: int):
         """Called when conversion finishes."""
+        self._apply_pending()
         self.is_converting = False
-        self.progress.stop()
         self.convert_button.config(state=tk.NORMAL)
         self.browse_button.config(state=tk.NORMAL)
+        self.gpu_checkbox.config(state=tk.NORMAL)
+        self.preset_combo.config(state="readonly")
 
         if success == total:
             self.status_label.config(
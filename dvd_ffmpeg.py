@@ -0,0 +1,296 @@
+"""
+FFmpeg helpers shared by the DVD converter CLI and GUI.
+
+Groups VOB files into DVD titles, probes them with ffprobe and builds
+the FFmpeg command line for each encoder.
+"""
+
+import contextlib
+import functools
+import os
+import subprocess
+import sys
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+
+# Hide console windows of child processes on Windows
+CREATION_FLAGS = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+
+X264_PRESETS = [
+    "ultrafast", "superfast", "veryfast", "faster", "fast",
+    "medium", "slow", "slower", "veryslow",
+]
+
+# Hardware H.264 encoders in order of preference: (input args, encoder args)
+HW_ENCODERS: dict[str, tuple[list[str], list[str]]] = {
+    "h264_nvenc": (
+        [
+            "-hwaccel", "cuda",             # Decode on the GPU as well
+            "-hwaccel_output_format", "cuda",  # Keep frames in GPU memory
+        ],
+        [
+            "-c:v", "h264_nvenc",   # NVIDIA hardware H.264 encoder
+            "-preset", "p5",        # Slower NVENC preset, closer to x264 quality
+            "-tune", "hq",          # High quality tuning
+            "-rc", "vbr",           # Variable bitrate, quality driven by -cq
+            "-cq", "19",            # Quality (NVENC ignores -crf)
+            "-b:v", "0",            # No average bitrate target, let -cq decide
+            "-maxrate", "12M",      # Cap peaks for smooth playback
+            "-bufsize", "24M",
+            "-profile:v", "high",
+            "-spatial_aq", "1",     # Adaptive quantization, avoids blurry
+            "-temporal_aq", "1",    # flat areas at the same bitrate
+        ],
+    ),
+    "h264_qsv": (
+        ["-hwaccel", "auto"],
+        [
+            "-c:v", "h264_qsv",     # Intel Quick Sync H.264 encoder
+            "-preset", "medium",
+            "-global_quality", "20",  # Quality (QSV equivalent of -crf)
+            "-look_ahead", "1",
+        ],
+    ),
+    "h264_amf": (
+        ["-hwaccel", "auto"],
+        [
+            "-c:v", "h264_amf",     # AMD AMF H.264 encoder
+            "-quality", "balanced",
+            "-rc", "cqp",           # Constant quantizer
+            "-qp_i", "20",
+            "-qp_p", "22",
+        ],
+    ),
+    "h264_vaapi": (
+        ["-vaapi_device", "/dev/dri/renderD128"],
+        [
+            "-vf", "format=nv12,hwupload",  # Upload frames to the GPU
+            "-c:v", "h264_vaapi",   # VA-API H.264 encoder (Linux)
+            "-qp", "20",
+        ],
+    ),
+}
+
+
+def get_vob_files(folder: Path) -> list[tuple[Path, int]]:
+    """
+    Get VOB files that contain actual video content, with their sizes.
+    Filters out small menu/navigation VOBs (< 1MB).
+    """
+    with os.scandir(folder) as it:
+        entries = sorted(
+            (e.name, e.stat().st_size) for e in it
+            if e.name.upper().endswith(".VOB") and e.stat().st_size > 1_000_000
+        )
+    return [(folder / name, size) for name, size in entries]
+
+
+def group_titles(vob_files: list[Path]) -> dict[str, list[Path]]:
+    """
+    Group VOB files by DVD title (VTS_01_1.VOB, VTS_01_2.VOB -> VTS_01).
+    A title is split into ~1GB VOB segments meant to be played back to back.
+    VTS_NN_0.VOB is the title set's menu, so it is kept as an entry of its own.
+    """
+    titles: dict[str, list[Path]] = {}
+    for vob in vob_files:
+        prefix, sep, segment = vob.stem.rpartition("_")
+        if sep and prefix.upper().startswith("VTS_") and segment != "0":
+            title = prefix
+        else:
+            title = vob.stem
+        titles.setdefault(title, []).append(vob)
+    return titles
+
+
+def write_concat_list(vob_files: list[Path], list_path: Path):
+    """
+    Write an FFmpeg concat demuxer list for the given VOB files.
+    Each VOB is opened by its own demuxer, so the probe options are set per file
+    to detect all MPEG-PS streams (e.g. late-starting audio) up front.
+    """
+    lines = ["ffconcat version 1.0\n"]
+    for vob in vob_files:
+        escaped = str(vob.resolve()).replace("'", "'\\''")
+        lines.append(f"file '{escaped}'\n")
+        lines.append("option probesize 100M\n")
+        lines.append("option analyzeduration 100M\n")
+    list_path.write_text("".join(lines), encoding="utf-8")
+
+
+@contextlib.contextmanager
+def concat_list(vob_files: list[Path]) -> Iterator[Path]:
+    """Write a temporary concat list for the VOB files and yield its path."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        list_path = Path(tmp_dir) / "concat.txt"
+        write_concat_list(vob_files, list_path)
+        yield list_path
+
+
+def worker_layout(job_count: int) -> tuple[int, int]:
+    """
+    Return (workers, threads per FFmpeg) for converting job_count titles.
+    Several titles run at once, each FFmpeg getting its share of the cores.
+    """
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(job_count, cpu_count // 4))
+    return workers, max(1, cpu_count // workers)
+
+
+@functools.cache
+def detect_encoders(ffmpeg: str) -> tuple[str, ...]:
+    """
+    List the hardware H.264 encoders FFmpeg was built with, in order of preference.
+    Being built in does not mean the hardware is present, so each is tried in turn.
+    """
+    try:
+        result = subprocess.run(
+            [ffmpeg, "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True,
+            check=True,
+            creationflags=CREATION_FLAGS
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return ()
+    available = {line.split()[1] for line in result.stdout.splitlines() if len(line.split()) > 1}
+    return tuple(encoder for encoder in HW_ENCODERS if encoder in available)
+
+
+def probe_duration(ffprobe: str, path: Path) -> float:
+    """Return the duration of a media file in seconds, or 0 if unknown."""
+    try:
+        result = subprocess.run(
+            [
+                ffprobe,
+                "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "csv=p=0",
+                str(path)
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            creationflags=CREATION_FLAGS
+        )
+        return float(result.stdout.strip())
+    except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
+        return 0.0
+
+
+def probe_codec(ffprobe: str, path: Path, stream: str) -> str | None:
+    """Return the codec name of a stream (e.g. "a:0"), or None if unknown."""
+    try:
+        result = subprocess.run(
+            [
+                ffprobe,
+                "-v", "error",
+                "-select_streams", stream,
+                "-show_entries", "stream=codec_name",
+                "-of", "csv=p=0",
+                str(path)
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            creationflags=CREATION_FLAGS
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    return result.stdout.strip() or None
+
+
+def plan_title(
+    ffmpeg: str, ffprobe: str, vob_files: list[Path], use_gpu: bool = True
+) -> tuple[list[str], str | None]:
+    """
+    Return the encoders to try for a title, in order, and its audio codec.
+    H.264 sources are remuxed first. FFmpeg lists hardware encoders even
+    without the matching GPU, so each is tried before falling back to libx264.
+    """
+    encoders = [*detect_encoders(ffmpeg), "libx264"] if use_gpu else ["libx264"]
+    if probe_codec(ffprobe, vob_files[0], "v:0") == "h264":
+        encoders.insert(0, "copy")
+    return encoders, probe_codec(ffprobe, vob_files[0], "a:0")
+
+
+def build_command(
+    ffmpeg: str,
+    list_path: Path,
+    output_path: Path,
+    encoder: str,
+    *,
+    preset: str = "faster",
+    threads: int = 0,
+    audio_codec: str | None = None,
+    segment_time: int | None = None,
+    loglevel: str = "warning",
+    progress: bool = False,
+    stats: bool = True,
+    use_gpu: bool = True
+) -> list[str]:
+    """
+    Build the FFmpeg command line for converting one concat list of VOBs.
+    encoder is "copy", "libx264" or one of HW_ENCODERS. With progress,
+    machine-readable progress is written to stdout. Without stats, the
+    interactive progress line is suppressed, e.g. when several run at once
+    on one console. Without use_gpu, libx264 also decodes on the CPU.
+    """
+    if encoder == "copy":
+        decode_args = []
+        video_args = ["-c:v", "copy"]  # Already H.264, remux only
+    elif encoder in HW_ENCODERS:
+        decode_args, video_args = HW_ENCODERS[encoder]
+    else:
+        # Let FFmpeg pick any available hardware decoder; frames are copied
+        # back to system memory automatically for libx264
+        decode_args = ["-hwaccel", "auto"] if use_gpu else []
+        video_args = [
+            "-c:v", "libx264",      # H.264 video codec (universal compatibility)
+            "-preset", preset,      # "faster" by default, negligible quality loss
+            "-crf", "20",           # Quality (18-23 is visually lossless range)
+        ]
+
+    if audio_codec in ("ac3", "eac3"):
+        # DVD Dolby Digital muxes into MP4 as-is, no lossy re-encode needed
+        audio_args = ["-c:a", "copy"]
+    else:
+        audio_args = [
+            "-c:a", "aac",      # AAC audio codec
+            "-b:a", "192k",     # Audio bitrate
+        ]
+
+    if segment_time:
+        # One encoder run, split into chunks of segment_time seconds
+        output_args = [
+            "-f", "segment",
+            "-segment_time", str(segment_time),
+            "-reset_timestamps", "1",   # Each chunk starts at 0
+            "-segment_format_options", "movflags=+faststart",
+        ]
+    else:
+        output_args = ["-movflags", "+faststart"]  # Enable streaming playback
+
+    if progress:
+        output_args += ["-progress", "pipe:1"]
+
+    return [
+        ffmpeg,
+        "-hide_banner",         # Skip the build configuration banner
+        "-nostdin",             # Never read the console, safe to run in parallel
+        "-loglevel", loglevel,
+        *([] if stats and not progress else ["-nostats"]),
+        *decode_args,
+        "-fflags", "+genpts",   # Regenerate timestamps broken at cell boundaries
+        "-f", "concat",         # Join all VOBs of the title into one stream
+        "-safe", "0",           # Allow absolute paths in the list
+        "-i", str(list_path),
+        "-map", "0:v:0",        # The video and audio streams that were probed,
+        "-map", "0:a:0?",       # not whichever FFmpeg ranks best (audio optional)
+        *video_args,
+        "-threads", str(threads),  # Share the CPU with concurrent conversions
+        *audio_args,
+        *output_args,
+        "-y",                   # Overwrite output without asking
+        str(output_path)
+    ]
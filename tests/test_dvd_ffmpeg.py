@@ -0,0 +1,147 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from dvd_ffmpeg import build_command, group_titles, write_concat_list
+
+
+class GroupTitlesTest(unittest.TestCase):
+    def test_groups_segments_by_title(self):
+        vobs = [Path(name) for name in ["VTS_01_1.VOB", "VTS_01_2.VOB", "VTS_02_1.VOB"]]
+        self.assertEqual(
+            group_titles(vobs),
+            {
+                "VTS_01": [Path("VTS_01_1.VOB"), Path("VTS_01_2.VOB")],
+                "VTS_02": [Path("VTS_02_1.VOB")],
+            },
+        )
+
+    def test_menu_vob_is_not_part_of_title(self):
+        vobs = [Path(name) for name in ["VTS_01_0.VOB", "VTS_01_1.VOB", "VTS_01_2.VOB"]]
+        self.assertEqual(
+            group_titles(vobs),
+            {
+                "VTS_01_0": [Path("VTS_01_0.VOB")],
+                "VTS_01": [Path("VTS_01_1.VOB"), Path("VTS_01_2.VOB")],
+            },
+        )
+
+    def test_other_names_are_their_own_title(self):
+        vobs = [Path("VIDEO_TS.VOB"), Path("movie.vob")]
+        self.assertEqual(
+            group_titles(vobs),
+            {"VIDEO_TS": [Path("VIDEO_TS.VOB")], "movie": [Path("movie.vob")]},
+        )
+
+
+class WriteConcatListTest(unittest.TestCase):
+    def test_quotes_paths(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            folder = Path(tmp_dir).resolve()
+            vobs = [folder / "it's" / "VTS_01_1.VOB", folder / "VTS_01_2.VOB"]
+            list_path = folder / "concat.txt"
+            write_concat_list(vobs, list_path)
+            lines = list_path.read_text(encoding="utf-8").splitlines()
+        sep = os.sep
+        self.assertIn(f"file '{folder}{sep}it'\\''s{sep}VTS_01_1.VOB'", lines)
+        self.assertIn(f"file '{folder / 'VTS_01_2.VOB'}'", lines)
+
+    def test_header_and_per_file_probe_options(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            folder = Path(tmp_dir).resolve()
+            list_path = folder / "concat.txt"
+            write_concat_list([folder / "VTS_01_1.VOB", folder / "VTS_01_2.VOB"], list_path)
+            lines = list_path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(lines[0], "ffconcat version 1.0")
+        self.assertEqual(
+            lines[1:4],
+            [
+                f"file '{folder / 'VTS_01_1.VOB'}'",
+                "option probesize 100M",
+                "option analyzeduration 100M",
+            ],
+        )
+        self.assertEqual(lines[4:].count("option probesize 100M"), 1)
+
+
+class BuildCommandTest(unittest.TestCase):
+    def build(self, encoder, **kwargs):
+        return build_command("ffmpeg", Path("list.txt"), Path("out.mp4"), encoder, **kwargs)
+
+    def option(self, cmd, name):
+        return cmd[cmd.index(name) + 1]
+
+    def test_input_and_output_layout(self):
+        cmd = self.build("libx264")
+        self.assertEqual(cmd[0], "ffmpeg")
+        self.assertEqual(cmd[-2:], ["-y", "out.mp4"])
+        self.assertEqual(self.option(cmd, "-f"), "concat")
+        self.assertEqual(self.option(cmd, "-i"), "list.txt")
+        self.assertLess(cmd.index("-f"), cmd.index("-i"))
+        self.assertEqual(self.option(cmd, "-movflags"), "+faststart")
+        # Probe options live in the concat list, per VOB
+        self.assertNotIn("-probesize", cmd)
+        self.assertEqual(self.option(cmd, "-fflags"), "+genpts")
+
+    def test_copy(self):
+        cmd = self.build("copy", audio_codec="ac3")
+        self.assertEqual(self.option(cmd, "-c:v"), "copy")
+        self.assertEqual(self.option(cmd, "-c:a"), "copy")
+        self.assertNotIn("-hwaccel", cmd)
+
+    def test_libx264(self):
+        cmd = self.build("libx264", preset="slow", threads=4, audio_codec="mp2")
+        self.assertEqual(self.option(cmd, "-c:v"), "libx264")
+        self.assertEqual(self.option(cmd, "-preset"), "slow")
+        self.assertEqual(self.option(cmd, "-crf"), "20")
+        self.assertEqual(self.option(cmd, "-threads"), "4")
+        self.assertEqual(self.option(cmd, "-c:a"), "aac")
+        self.assertEqual(self.option(cmd, "-hwaccel"), "auto")
+        self.assertLess(cmd.index("-hwaccel"), cmd.index("-i"))
+
+    def test_libx264_without_gpu(self):
+        cmd = self.build("libx264", use_gpu=False)
+        self.assertNotIn("-hwaccel", cmd)
+
+    def test_hardware_encoder(self):
+        cmd = self.build("h264_nvenc")
+        self.assertEqual(self.option(cmd, "-c:v"), "h264_nvenc")
+        self.assertEqual(self.option(cmd, "-hwaccel"), "cuda")
+        self.assertLess(cmd.index("-hwaccel"), cmd.index("-i"))
+        self.assertNotIn("-crf", cmd)
+
+    def test_vaapi_device_is_an_input_option(self):
+        cmd = self.build("h264_vaapi")
+        self.assertLess(cmd.index("-vaapi_device"), cmd.index("-i"))
+        self.assertGreater(cmd.index("-vf"), cmd.index("-i"))
+
+    def test_segment(self):
+        cmd = self.build("libx264", segment_time=900)
+        self.assertEqual(cmd[cmd.index("-i") + 2:].count("-f"), 1)
+        self.assertEqual(self.option(cmd[cmd.index("-i"):], "-f"), "segment")
+        self.assertEqual(self.option(cmd, "-segment_time"), "900")
+        self.assertEqual(self.option(cmd, "-reset_timestamps"), "1")
+        self.assertNotIn("-movflags", cmd)
+
+    def test_progress(self):
+        cmd = self.build("libx264", progress=True)
+        self.assertEqual(self.option(cmd, "-progress"), "pipe:1")
+        self.assertEqual(cmd.count("-nostats"), 1)
+
+    def test_maps_probed_streams(self):
+        cmd = self.build("copy")
+        maps = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"]
+        self.assertEqual(maps, ["0:v:0", "0:a:0?"])
+        self.assertGreater(cmd.index("-map"), cmd.index("-i"))
+
+    def test_never_reads_stdin(self):
+        self.assertIn("-nostdin", self.build("copy"))
+
+    def test_stats(self):
+        self.assertNotIn("-nostats", self.build("libx264"))
+        self.assertIn("-nostats", self.build("libx264", stats=False))
+
+
+if __name__ == "__main__":
+    unittest.main()